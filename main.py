@@ -1,31 +1,94 @@
 import logging
 from dataclasses import dataclass
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from pydantic import BaseModel, ConfigDict, ValidationError
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Type
 import os
-import json
-from openai import OpenAI
+import orjson
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from collections import OrderedDict, deque
+from functools import lru_cache
+import numpy as np
+import diskcache
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, RateLimitError, Timeout
 from dotenv import load_dotenv
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await game.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-
-@dataclass
+# The game logger is configured once per process, not per TabooGame instance
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+logging.getLogger('taboo_game').addHandler(_log_handler)
+logging.getLogger('taboo_game').setLevel(logging.DEBUG)
+
+# The .env file is parsed once per process, before any configuration is read
+load_dotenv()
+
+
+class WordSchema(BaseModel):
+    """Structured output of the word generation prompt"""
+    model_config = ConfigDict(extra="forbid")
+    word: str
+    banned: List[str]
+
+class HintSchema(BaseModel):
+    """Structured output of the hint generation prompt"""
+    model_config = ConfigDict(extra="forbid")
+    hint: str
+
+
+def _response_format(name: str, schema: Type[BaseModel]) -> Dict:
+    """Build a strict json_schema response format from a Pydantic model"""
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema.model_json_schema()}}
+
+
+RESPONSE_CACHE_SIZE = 1024
+# Entries of the optional on-disk response cache expire after a day
+DISK_CACHE_TTL = 86400
+HINT_QUEUE_GAMES = 256
+SEMANTIC_CACHE_SIZE = 10000
+SEMANTIC_CACHE_THRESHOLD = 0.95
+# Sentence endings that need no added period, also when followed by closing quotes or brackets
+HINT_SENTENCE_ENDINGS = frozenset(".!?…。！？")
+HINT_CLOSING_MARKS = "\"')]»”’」』"
+# Upper bound on the hint requests of one /hints_batch call, each of which may cost a model call
+MAX_HINTS_BATCH_SIZE = 20
+# Older wrong guesses rarely help the model, so only the most recent ones are sent
+MAX_PREVIOUS_GUESSES = 10
+# Strict structured-output schemas, so responses always parse on the first try
+WORD_RESPONSE_FORMAT = _response_format("taboo_word", WordSchema)
+HINT_RESPONSE_FORMAT = _response_format("taboo_hint", HintSchema)
+# Timeouts of the OpenAI client; built from the SDK's own type, which matches the transport it ships with
+HTTP_TIMEOUT = Timeout(60.0, connect=5.0)
+# Rough prompt size estimate used for rate limiting, independent of the provider's tokenizer
+CHARS_PER_TOKEN = 4
+
+
+@dataclass(slots=True, frozen=True)
 class game_config:
     """Configuration settings for the game"""
-    topic: str
-    difficulty: str
+    # Declared most stable first; this is also the key order of the serialized prompt
     language: str
+    difficulty: str
+    topic: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class wrong_guess:
     """Structure for storing wrong guesses and their corresponding hints"""
     predict: str
@@ -37,27 +100,306 @@ class TabooGameException(Exception):
     pass
 
 
+class RateLimiter:
+    """Token-bucket limiter for outgoing requests per minute and prompt tokens per minute"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._available_requests = requests_per_minute or 0.0
+        self._available_tokens = tokens_per_minute or 0.0
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until both buckets can cover one request of the given token count, then consume it"""
+        if not (self.requests_per_minute or self.tokens_per_minute):
+            return
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = max(
+                    self._wait_time(self._available_requests, 1, self.requests_per_minute),
+                    self._wait_time(self._available_tokens, tokens, self.tokens_per_minute),
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self._available_requests -= 1
+            self._available_tokens -= tokens
+
+    def penalize(self) -> None:
+        """Empty both buckets after the provider reported a rate limit"""
+        self._refill()
+        self._available_requests = min(self._available_requests, 0.0)
+        self._available_tokens = min(self._available_tokens, 0.0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed_minutes = (now - self._last_refill) / 60
+        self._last_refill = now
+        if self.requests_per_minute:
+            self._available_requests = min(self.requests_per_minute, self._available_requests + elapsed_minutes * self.requests_per_minute)
+        if self.tokens_per_minute:
+            self._available_tokens = min(self.tokens_per_minute, self._available_tokens + elapsed_minutes * self.tokens_per_minute)
+
+    @staticmethod
+    def _wait_time(available: float, needed: float, per_minute: Optional[float]) -> float:
+        if not per_minute or available >= needed:
+            return 0.0
+        return (needed - available) / per_minute * 60
+
+
+def _load_prompt(filename: str) -> str:
+    """Load and return content from a prompt file"""
+    try:
+        with open(filename, "r") as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        raise TabooGameException(f"Required prompt file {filename} not found")
+
+
+# System prompts are read once at import and shared by every TabooGame instance
+_SYSTEM_PROMPT_WORDGEN = _load_prompt("system_prompts/system_prompt_wordgen.txt")
+_SYSTEM_PROMPT_HINTGEN = _load_prompt("system_prompts/system_prompt_hintgen.txt")
+
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def _config_json(config: game_config) -> str:
+    """Serialize a word config for the prompt, memoized since game_config is frozen and hashable"""
+    # orjson encodes dataclasses natively in field order, without building an intermediate dict
+    return orjson.dumps(config).decode()
+
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def _guess_json(guess: wrong_guess) -> str:
+    """Serialize one wrong guess, memoized so each guess is encoded once per game rather than once per hint"""
+    return orjson.dumps(guess).decode()
+
+
+def _normalize_hint(hint: str) -> str:
+    """Trim whitespace and a wrapping pair of quotes from a hint and make sure it ends with punctuation"""
+    hint = hint.strip()
+    # Only a single pair around the whole hint is wrapping; quotes inside the text are kept
+    if len(hint) >= 2 and hint[0] == hint[-1] == '"' and hint.count('"') == 2:
+        hint = hint[1:-1].strip()
+    if not hint or hint.rstrip(HINT_CLOSING_MARKS)[-1:] in HINT_SENTENCE_ENDINGS:
+        return hint
+    return hint + "."
+
+
+class HintStreamParser:
+    """Incrementally extracts the first string value after a colon from streamed JSON chunks.
+
+    Returns decoded text as soon as it arrives, so a streamed {"hint": "..."} response
+    can be shown before the closing quote is generated.
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self):
+        self.done = False
+        self._seen_colon = False
+        self._in_string = False
+        self._in_value = False
+        self._escape: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk of the response and return the newly decoded part of the value"""
+        decoded = []
+        for char in chunk:
+            if self.done:
+                break
+            if self._in_value:
+                self._feed_value_char(char, decoded)
+            elif self._in_string:
+                if self._escape is not None:
+                    self._escape = None
+                elif char == "\\":
+                    self._escape = ""
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._seen_colon:
+                    self._in_value = True
+                else:
+                    self._in_string = True
+            elif char == ":":
+                self._seen_colon = True
+        return "".join(decoded)
+
+    def _feed_value_char(self, char: str, decoded: List[str]) -> None:
+        if self._escape is None:
+            if char == "\\":
+                self._escape = ""
+            elif char == '"':
+                self.done = True
+            else:
+                decoded.append(char)
+            return
+        self._escape += char
+        if self._escape[0] != "u":
+            decoded.append(self._ESCAPES.get(self._escape, self._escape))
+            self._escape = None
+        elif len(self._escape) == 5:
+            self._append_code_point(int(self._escape[1:], 16), decoded)
+            self._escape = None
+
+    def _append_code_point(self, code: int, decoded: List[str]) -> None:
+        # Characters outside the BMP arrive as two \u escapes that may span chunks
+        if 0xD800 <= code < 0xDC00:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        decoded.append(chr(code))
+
+
+class HintBatcher:
+    """Coalesces identical hint requests that arrive within a short window into one n>1 completion"""
+
+    def __init__(self, request_contents: Callable[[List[str], int], Awaitable[List[str]]], window_ms: float):
+        self._request_contents = request_contents
+        self._window = window_ms / 1000
+        self._batches: Dict[str, List] = {}
+        self._flush_tasks: set = set()
+
+    async def submit(self, user_contents: List[str], num_hints: int) -> List[str]:
+        """Wait for the batch of this prompt and return num_hints contents from the shared completion"""
+        key = "\0".join(user_contents)
+        future = asyncio.get_running_loop().create_future()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = []
+            task = asyncio.create_task(self._flush(key, user_contents))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        batch.append((future, num_hints))
+        return await future
+
+    async def _flush(self, key: str, user_contents: List[str]) -> None:
+        await asyncio.sleep(self._window)
+        batch = self._batches.pop(key)
+        try:
+            hints = await self._request_contents(user_contents, sum(n for _, n in batch))
+        except Exception as e:
+            for future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        # Hand out the choices in order, wrapping around if the provider returned fewer than requested
+        position = 0
+        for future, n in batch:
+            if not future.done():
+                future.set_result([hints[(position + i) % len(hints)] for i in range(n)])
+            position += n
+
+
+class SemanticCache:
+    """Bounded LRU store of responses looked up by embedding cosine similarity.
+
+    Entries only match lookups with the same scope, so similarity never bridges requests
+    whose fixed parameters differ.
+    """
+
+    def __init__(self, max_entries: int = SEMANTIC_CACHE_SIZE, threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # Unit vectors live in one preallocated matrix, so a lookup is a single matrix-vector product
+        self._vectors: Optional[np.ndarray] = None
+        self._responses: List[List[str]] = []
+        self._scopes: List[str] = []
+        self._slots: Dict[str, List[int]] = {}
+        self._last_used: np.ndarray = np.zeros(max_entries, dtype=np.int64)
+        self._clock = 0
+
+    def lookup(self, scope: str, embedding: List[float]) -> Optional[List[str]]:
+        """Return the response stored for the most similar embedding in the scope, if it clears the threshold"""
+        slots = self._slots.get(scope)
+        if not slots:
+            return None
+        similarities = self._vectors[slots] @ self._normalize(embedding)
+        best = int(np.argmax(similarities))
+        if similarities[best] > self.threshold:
+            self._touch(slots[best])
+            return self._responses[slots[best]]
+        return None
+
+    def add(self, scope: str, embedding: List[float], response: List[str]) -> None:
+        """Store a response under its scope and embedding, evicting the least recently used entry when full"""
+        vector = self._normalize(embedding)
+        if self._vectors is None:
+            self._vectors = np.empty((self.max_entries, vector.shape[0]), dtype=np.float32)
+        if len(self._responses) < self.max_entries:
+            slot = len(self._responses)
+            self._responses.append(response)
+            self._scopes.append(scope)
+        else:
+            slot = int(np.argmin(self._last_used))
+            evicted = self._slots[self._scopes[slot]]
+            evicted.remove(slot)
+            if not evicted:
+                del self._slots[self._scopes[slot]]
+            self._responses[slot] = response
+            self._scopes[slot] = scope
+        self._slots.setdefault(scope, []).append(slot)
+        self._vectors[slot] = vector
+        self._touch(slot)
+
+    def _touch(self, slot: int) -> None:
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
 class TabooGame:
     def __init__(self):
         """Initialize the TabooGame with API configurations and prompts"""
-        load_dotenv()
         self.logger = logging.getLogger('taboo_game')
-        self.logger.setLevel(logging.DEBUG)
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        self.logger.addHandler(handler)
-        load_dotenv()
 
         # Initialize OpenAI client
         self._initialize_api_client()
 
-        # Load system prompts
-        self.system_prompt_wordgen = self._load_prompt("system_prompts/system_prompt_wordgen.txt")
-        self.system_prompt_hintgen = self._load_prompt("system_prompts/system_prompt_hintgen.txt")
+        # System prompts
+        self.system_prompt_wordgen = _SYSTEM_PROMPT_WORDGEN
+        self.system_prompt_hintgen = _SYSTEM_PROMPT_HINTGEN
+        # The system messages never change, so they are built once and shared by every request
+        self._system_messages: Dict[str, Dict] = {
+            prompt: self._system_message(prompt) for prompt in (self.system_prompt_wordgen, self.system_prompt_hintgen)
+        }
         # Game state
         self.current_word: Optional[str] = None
         self.attempts: int = 0
         self.max_attempts: int = 5
+        # Hints generated ahead of time by n>1 requests, keyed by the client's game id
+        self.hints_per_request: int = int(os.getenv("HINTS_PER_REQUEST", "1"))
+        self.warm_prompt_cache: bool = os.getenv("WARM_PROMPT_CACHE", "0") == "1"
+        # Optional window for merging concurrent identical hint requests into one call
+        batch_window_ms = float(os.getenv("BATCH_WINDOW_MS", "0"))
+        self._hint_batcher = HintBatcher(self._request_hint_contents, batch_window_ms) if batch_window_ms > 0 else None
+        self._hint_queues: "OrderedDict[str, deque]" = OrderedDict()
+        # Background refills of drained queues that are still running, by game id
+        self._hint_refills: Dict[str, asyncio.Task] = {}
+        # References to fire-and-forget tasks, so they are not garbage collected mid-flight
+        self._background_tasks: set = set()
+        # Exact-match cache of completion contents, kept in LRU order
+        self._response_cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        # Cacheable requests currently waiting on the API, by cache key
+        self._pending_responses: Dict[str, asyncio.Future] = {}
+        # Optional second tier shared across workers and restarts
+        cache_dir = os.getenv("RESPONSE_CACHE_DIR")
+        self._disk_cache: Optional[diskcache.Cache] = diskcache.Cache(cache_dir) if cache_dir else None
+        # Near-duplicate cache, only consulted when SEMANTIC_CACHE_ENABLED=1
+        self._semantic_cache = SemanticCache()
 
     def _initialize_api_client(self) -> None:
         """Initialize the OpenAI API client with environment variables"""
@@ -65,126 +407,460 @@ class TabooGame:
         api_key = os.getenv("API_KEY")
         base_url = os.getenv("BASE_URL")
         self.model = os.getenv("MODEL_NAME")
+        self.semantic_cache_enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "0") == "1"
+        self.embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+        self.prompt_cache_control = os.getenv("PROMPT_CACHE_CONTROL", "0") == "1"
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=float(os.getenv("REQUESTS_PER_MINUTE", "0")) or None,
+            tokens_per_minute=float(os.getenv("TOKENS_PER_MINUTE", "0")) or None,
+        )
 
         if not all([api_key, base_url, self.model]):
             self.logger.error("Missing required environment variables: API_KEY, BASE_URL, and MODEL_NAME must be set.")
             raise TabooGameException("Missing required environment variables: API_KEY, BASE_URL, and MODEL_NAME must be set.")
 
         try:
-            self.logger.debug(f"Attempting to initialize OpenAI client with api_key: {api_key}, base_url: {base_url}, model: {self.model}")
-            self.client = OpenAI(api_key=api_key, base_url=base_url)
+            self.logger.debug("Attempting to initialize OpenAI client with base_url: %s, model: %s", base_url, self.model)
+            # HTTP/2 multiplexes concurrent calls over one pooled connection; pool limits are the SDK defaults
+            http_client = DefaultAsyncHttpxClient(http2=True)
+            self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, timeout=HTTP_TIMEOUT)
             self.logger.info("OpenAI API client initialized successfully")
         except Exception as e:
-            self.logger.error(f"Failed to initialize OpenAI API client: {str(e)}")
+            self.logger.error("Failed to initialize OpenAI API client: %s", e)
             raise TabooGameException(f"Failed to initialize OpenAI API client: {str(e)}")
 
-    def _load_prompt(self, filename: str) -> str:
-        """Load and return content from a prompt file"""
+    async def close(self) -> None:
+        """Close the pooled HTTP/2 connections of the API client and the disk cache"""
+        # Let refills and disk writes finish first; a finishing refill may still start new writes
+        while self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self.client.close()
+        if self._disk_cache is not None:
+            self._disk_cache.close()
+
+    async def _cached_completion(self, system: str, user_contents: List[str], response_format: Dict, temperature: int = 1, deterministic: bool = False, n: int = 1, semantic_text: Optional[str] = None, validate: Optional[Callable[[str], object]] = None) -> List[str]:
+        """Request n JSON completions and return their contents, reusing cached responses for deterministic prompts.
+
+        Each entry of user_contents is sent as its own user message, in order, so callers can put
+        the parts that stay constant across calls first and keep the provider's prompt cache warm.
+        semantic_text is what gets embedded for the semantic cache; it defaults to the user messages.
+        validate is called on every fresh content and should raise for malformed ones, which are then not cached.
+        """
+        if not (deterministic or temperature == 0):
+            return await self._request_completion(system, user_contents, response_format, temperature, n)
+
+        key = self._cache_key(system, user_contents, response_format, temperature, n)
+        while True:
+            contents = self._lookup_response(key)
+            if contents is not None:
+                return contents
+
+            # Identical requests arriving while the first is still waiting on the API share its result
+            pending = self._pending_responses.get(key)
+            if pending is None:
+                break
+            self.logger.debug("Joining in-flight request")
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only the request that owned the call was cancelled; look again and fetch ourselves if needed
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_responses[key] = future
+        try:
+            contents = await self._fetch_completion(key, system, user_contents, response_format, temperature, n, semantic_text, validate)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when no other request joined
+            raise
+        finally:
+            del self._pending_responses[key]
+        future.set_result(contents)
+        return contents
+
+    async def _fetch_completion(self, key: str, system: str, user_contents: List[str], response_format: Dict, temperature: int, n: int, semantic_text: Optional[str] = None, validate: Optional[Callable[[str], object]] = None) -> List[str]:
+        """Resolve an in-memory cache miss from the disk cache, the semantic cache or the API, and cache the result"""
+        contents = await self._lookup_disk_response(key)
+        if contents is not None:
+            return contents
+
+        embedding = None
+        if self.semantic_cache_enabled:
+            # Only requests with the same options and word props (the leading message) are compared
+            scope = self._cache_key(system, user_contents[:1], response_format, temperature, n)
+            embedding = await self._embed(semantic_text or "\n".join(user_contents))
+            contents = self._semantic_cache.lookup(scope, embedding)
+            if contents is not None:
+                self.logger.debug("Semantic cache hit")
+                self._store_response(key, contents)
+                return contents
+
+        contents = await self._request_completion(system, user_contents, response_format, temperature, n)
+        if validate is not None:
+            # A malformed reply raises before reaching any cache tier, so a retry asks the API again
+            for content in contents:
+                validate(content)
+        self._store_response(key, contents)
+        if embedding is not None:
+            self._semantic_cache.add(scope, embedding, contents)
+        return contents
+
+    async def _request_completion(self, system: str, user_contents: List[str], response_format: Dict, temperature: int, n: int) -> List[str]:
+        """Call the chat completions API and return the content of every choice"""
+        messages = self._build_messages(system, user_contents)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Sending request to OpenAI API: %s", messages)
+        response = await self._create_completion(
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format,
+            n=n,
+        )
+        if response is None:
+            self.logger.error("OpenAI API response is None")
+            raise TabooGameException("OpenAI API response is None")
+        if not response.choices:
+            self.logger.error("OpenAI API response has no choices")
+            raise TabooGameException("OpenAI API response has no choices")
+        return [choice.message.content for choice in response.choices]
+
+    async def _create_completion(self, messages: List[Dict], **kwargs):
+        """Call the chat completions API once the rate limiter admits the request"""
+        prompt_chars = sum(
+            len(message["content"]) if isinstance(message["content"], str) else sum(len(part["text"]) for part in message["content"])
+            for message in messages
+        )
+        await self.rate_limiter.acquire(prompt_chars // CHARS_PER_TOKEN)
+        try:
+            return await self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+        except RateLimitError:
+            self.rate_limiter.penalize()
+            raise
+
+    def _cache_key(self, system: str, user_contents: List[str], response_format: Dict, temperature: int, n: int) -> str:
+        """Return the exact-match cache key of a request, covering every parameter that changes the response"""
+        options = orjson.dumps([response_format, temperature, n], option=orjson.OPT_SORT_KEYS).decode()
+        return hashlib.blake2b("\0".join((self.model, options, system, *user_contents)).encode()).hexdigest()
+
+    def _system_message(self, system: str) -> Dict:
+        """Build the system message for a prompt"""
+        if self.prompt_cache_control:
+            # Anthropic-style providers only cache blocks that are explicitly marked
+            return {"role": "system", "content": [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]}
+        return {"role": "system", "content": system}
+
+    def _build_messages(self, system: str, user_contents: List[str]) -> List[Dict]:
+        """Build the chat messages for a system prompt followed by one user message per content"""
+        system_message = self._system_messages.get(system) or self._system_message(system)
+        messages = [system_message]
+        messages.extend({"role": "user", "content": content} for content in user_contents)
+        return messages
+
+    def _lookup_response(self, key: str) -> Optional[List[str]]:
+        """Return a response from the in-memory exact-match cache"""
+        if key in self._response_cache:
+            self._response_cache.move_to_end(key)
+            self.logger.debug("Response cache hit")
+            return self._response_cache[key]
+        return None
+
+    async def _lookup_disk_response(self, key: str) -> Optional[List[str]]:
+        """Return a response from the disk cache when configured, promoting it into memory"""
+        if self._disk_cache is None:
+            return None
         try:
-            with open(filename, "r") as file:
-                return file.read().strip()
-        except FileNotFoundError:
-            raise TabooGameException(f"Required prompt file {filename} not found")
+            # diskcache does blocking SQLite I/O, so keep it off the event loop
+            contents = await asyncio.to_thread(self._disk_cache.get, key)
+        except Exception as e:
+            self.logger.warning("Disk cache lookup failed: %s", e)
+            return None
+        if contents is not None:
+            self.logger.debug("Disk cache hit")
+            self._store_response(key, contents, persist=False)
+        return contents
+
+    def _store_response(self, key: str, contents: List[str], persist: bool = True) -> None:
+        """Insert a response into the exact-match cache, evicting the least recently used entry"""
+        self._response_cache[key] = contents
+        if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+        if persist and self._disk_cache is not None:
+            self._spawn(self._persist_response(key, contents))
+
+    async def _persist_response(self, key: str, contents: List[str]) -> None:
+        try:
+            await asyncio.to_thread(self._disk_cache.set, key, contents, expire=DISK_CACHE_TTL)
+        except Exception as e:
+            self.logger.warning("Disk cache write failed: %s", e)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _embed(self, text: str) -> List[float]:
+        """Return the embedding vector of a request payload once the rate limiter admits the request"""
+        await self.rate_limiter.acquire(len(text) // CHARS_PER_TOKEN)
+        try:
+            response = await self.client.embeddings.create(model=self.embedding_model, input=text)
+        except RateLimitError:
+            self.rate_limiter.penalize()
+            raise
+        return response.data[0].embedding
 
-    def generate_taboo(self, config: game_config) -> Dict:
+    async def generate_taboo(self, config: game_config) -> Dict:
         """Generate a new taboo word and its properties"""
-        self.logger.info(f"Generating taboo word with config: {config.__dict__}")
+        self.logger.info("Generating taboo word with config: %s", config)
 
         if not isinstance(config, game_config):
-            self.logger.error(f"Invalid input: config must be an instance of game_config, but got {type(config)}")
+            self.logger.error("Invalid input: config must be an instance of game_config, but got %s", type(config))
             raise TabooGameException("Invalid input: config must be an instance of game_config")
 
         try:
-            messages = [
-                {"role": "system", "content": self.system_prompt_wordgen},
-                {"role": "user", "content": json.dumps(config.__dict__)}
-            ]
-            self.logger.debug(f"Sending request to OpenAI API: {messages}")
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=1,
-                response_format={"type": "json_object"},
-            )
-            if response is None:
-                self.logger.error("OpenAI API response is None")
-                raise TabooGameException("OpenAI API response is None")
-            if not response.choices:
-                self.logger.error("OpenAI API response has no choices")
-                raise TabooGameException("OpenAI API response has no choices")
-            content = response.choices[0].message.content
-            self.logger.info(f"OpenAI API response: {content}")
+            # Word generation is never cached: replaying a config should yield a fresh word
+            content = (await self._cached_completion(self.system_prompt_wordgen, [_config_json(config)], WORD_RESPONSE_FORMAT))[0]
+            self.logger.debug("OpenAI API response: %s", content)
             try:
-                parsed_content = json.loads(content)
-                if not isinstance(parsed_content, dict) or "word" not in parsed_content:
-                    self.logger.error(f"Invalid taboo word response format, missing 'word' key: {content}")
-                    raise TabooGameException(f"Invalid taboo word response format, missing 'word' key: {content}")
-                self.current_word = parsed_content["word"].lower()
-                banned_words = parsed_content.get("banned", [])
-                return {**parsed_content, "banned": banned_words}
-            except (json.JSONDecodeError, KeyError) as e:
-                self.logger.error(f"Invalid taboo word response format: {str(e)}\nResponse: {content}")
+                parsed_content = WordSchema.model_validate_json(content)
+            except ValidationError as e:
+                self.logger.error("Invalid taboo word response format: %s\nResponse: %s", e, content)
                 raise TabooGameException(f"Invalid taboo word response format: {str(e)}\nResponse: {content}")
+            self.current_word = parsed_content.word.lower()
+            return parsed_content.model_dump()
         except Exception as e:
-            self.logger.error(f"Failed to generate taboo word. OpenAI API error: {str(e)}")
+            self.logger.error("Failed to generate taboo word. OpenAI API error: %s", e)
             raise TabooGameException(f"Failed to generate taboo word. OpenAI API error: {str(e)}")
 
-    def generate_hint(self, props: Dict, previous_guesses: Optional[List[wrong_guess]] = None) -> str:
-        """Generate a new hint based on the word properties and previous guesses"""
-        self.logger.info(f"Generating hint with props: {props}, previous guesses: {previous_guesses}")
-        if not isinstance(props, dict):
-            self.logger.error(f"Invalid input: props must be a dict, but got {type(props)}")
-            raise TabooGameException("Invalid input: props must be a dict")
+    async def generate_hint(self, props: Dict, previous_guesses: Optional[List[wrong_guess]] = None, num_hints: Optional[int] = None, game_id: Optional[str] = None) -> str:
+        """Generate a new hint based on the word properties and previous guesses.
+
+        Extra hints from n>1 requests are queued under game_id and only served to later requests
+        of the same game; without a game_id every request gets a single hint from the model.
+        """
+        self._validate_hint_input(props, previous_guesses)
+        self.logger.info("Generating hint for word=%s, guesses=%d", props.get("word"), len(previous_guesses or []))
+
+        refill = self._hint_refills.get(game_id) if game_id is not None else None
+        if refill is not None:
+            # The next batch for this game is already being generated; wait for it instead of asking twice
+            await asyncio.shield(refill)
+        queue = self._hint_queues.get(game_id) if game_id is not None else None
+        if queue:
+            self.logger.debug("Serving queued hint for game: %s", game_id)
+            hint = queue.popleft()
+            if not queue:
+                # Refill while the player reads this hint, so the next one is ready when they guess
+                self._schedule_refill(game_id, props, previous_guesses, num_hints or self.hints_per_request)
+            return hint
+
+        num_hints = num_hints or (self.hints_per_request if game_id is not None else 1)
+        if self._hint_batcher is not None:
+            hints = await self._batched_hints(props, previous_guesses, num_hints)
+        else:
+            hints = await self._request_hints(props, previous_guesses, num_hints)
+        if game_id is not None and len(hints) > 1:
+            self._queue_hints(game_id, hints[1:])
+        return hints[0]
+
+    async def _request_hints(self, props: Dict, previous_guesses: Optional[List[wrong_guess]], num_hints: int) -> List[str]:
+        """Request num_hints hints for the word in a single completion call"""
+        try:
+            # Identical hint requests (e.g. client retries) are served from the cache;
+            # sorted keys make the payload independent of the client's key order
+            contents = await self._cached_completion(
+                self.system_prompt_hintgen,
+                self._hint_user_contents(props, previous_guesses),
+                HINT_RESPONSE_FORMAT,
+                deterministic=True,
+                n=num_hints,
+                semantic_text=self._hint_semantic_text(props, previous_guesses),
+                validate=self._parse_hint,
+            )
+            self.logger.debug("OpenAI API response: %s", contents)
+            return [self._parse_hint(content) for content in contents]
+        except Exception as e:
+            self.logger.error("Failed to generate hint. OpenAI API error: %s", e)
+            raise TabooGameException(f"Failed to generate hint. OpenAI API error: {str(e)}")
 
-        if previous_guesses and not isinstance(previous_guesses, list):
-            self.logger.error(f"Invalid input: previous_guesses must be a list, but got {type(previous_guesses)}")
-            raise TabooGameException("Invalid input: previous_guesses must be a list")
+    async def _batched_hints(self, props: Dict, previous_guesses: Optional[List[wrong_guess]], num_hints: int) -> List[str]:
+        """Serve a hint request from the exact-match caches, or join the batch of identical concurrent requests"""
+        try:
+            user_contents = self._hint_user_contents(props, previous_guesses)
+            key = self._cache_key(self.system_prompt_hintgen, user_contents, HINT_RESPONSE_FORMAT, 1, num_hints)
+            # Cached hints are returned right away instead of waiting out the batch window
+            contents = self._lookup_response(key) or await self._lookup_disk_response(key)
+            if contents is None:
+                contents = await self._hint_batcher.submit(user_contents, num_hints)
+                self._store_response(key, contents)
+            return [self._parse_hint(content) for content in contents]
+        except Exception as e:
+            self.logger.error("Failed to generate hint. OpenAI API error: %s", e)
+            raise TabooGameException(f"Failed to generate hint. OpenAI API error: {str(e)}")
+
+    async def _request_hint_contents(self, user_contents: List[str], num_hints: int) -> List[str]:
+        """Sample num_hints fresh hint contents, bypassing the cache so every batch gets its own choices"""
+        contents = await self._request_completion(self.system_prompt_hintgen, user_contents, HINT_RESPONSE_FORMAT, 1, num_hints)
+        for content in contents:
+            self._parse_hint(content)
+        return contents
 
+    def _schedule_refill(self, game_id: str, props: Dict, previous_guesses: Optional[List[wrong_guess]], num_hints: int) -> None:
+        """Prefetch the next batch of hints for a game in the background"""
+        # Copy the guesses so later mutations by the caller do not leak into the prefetch
+        self._hint_refills[game_id] = self._spawn(self._refill_hint_queue(game_id, props, list(previous_guesses or []), num_hints))
+
+    async def _refill_hint_queue(self, game_id: str, props: Dict, previous_guesses: List[wrong_guess], num_hints: int) -> None:
         try:
-            request_props = props.copy()
-            if previous_guesses:
-                request_props["olderwrongs"] = [g.__dict__ for g in previous_guesses]
+            hints = await self._request_hints(props, previous_guesses, num_hints)
+        except TabooGameException:
+            # Already logged; the next request of the game will simply call the API itself
+            return
+        finally:
+            del self._hint_refills[game_id]
+        self._queue_hints(game_id, hints)
+
+    async def stream_hint(self, props: Dict, previous_guesses: Optional[List[wrong_guess]] = None) -> AsyncIterator[Dict]:
+        """Stream a new hint, yielding {"delta": ...} events with hint text as it arrives and a final {"hint": ...} event"""
+        self._validate_hint_input(props, previous_guesses)
+        self.logger.info("Streaming hint for word=%s, guesses=%d", props.get("word"), len(previous_guesses or []))
 
-            messages = [
-                {"role": "system", "content": self.system_prompt_hintgen},
-                {"role": "user", "content": json.dumps(request_props)}
-            ]
-            self.logger.debug(f"Sending request to OpenAI API: {messages}")
-            response = self.client.chat.completions.create(
-                model=self.model,
+        try:
+            # Client-supplied props may not serialize (e.g. integers beyond 64 bits), which must map to a 400
+            user_contents = self._hint_user_contents(props, previous_guesses)
+            key = self._cache_key(self.system_prompt_hintgen, user_contents, HINT_RESPONSE_FORMAT, 1, 1)
+            cached = self._lookup_response(key) or await self._lookup_disk_response(key)
+            if cached is not None:
+                hint = self._parse_hint(cached[0])
+                yield {"delta": hint}
+                yield {"hint": hint}
+                return
+
+            messages = self._build_messages(self.system_prompt_hintgen, user_contents)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Sending streaming request to OpenAI API: %s", messages)
+            stream = await self._create_completion(
                 messages=messages,
-                response_format={"type": "json_object"},
                 temperature=1,
+                response_format=HINT_RESPONSE_FORMAT,
+                stream=True,
             )
+            chunks = []
+            parser = HintStreamParser()
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                chunks.append(chunk.choices[0].delta.content)
+                # Forward decoded hint text only, not the surrounding JSON syntax
+                text = parser.feed(chunks[-1])
+                if text:
+                    yield {"delta": text}
+        except Exception as e:
+            self.logger.error("Failed to stream hint. OpenAI API error: %s", e)
+            raise TabooGameException(f"Failed to stream hint. OpenAI API error: {str(e)}")
+
+        content = "".join(chunks)
+        self.logger.debug("OpenAI API response: %s", content)
+        # Parse first, so a malformed reply raises instead of being cached for later requests
+        hint = self._parse_hint(content)
+        self._store_response(key, [content])
+        yield {"hint": hint}
+
+    async def generate_hints_batch(self, props: Dict, n: Optional[int] = None) -> List[str]:
+        """Generate n independent hints for a word at once, for game modes where hints do not adapt to guesses"""
+        self._validate_hint_input(props, None)
+        n = n or self.max_attempts
+        if not 1 <= n <= self.max_attempts:
+            raise TabooGameException(f"Number of hints must be between 1 and {self.max_attempts}")
+        self.logger.info("Generating %d hints upfront for word=%s", n, props.get("word"))
 
-            if response is None:
-                self.logger.error("OpenAI API response is None")
-                raise TabooGameException("OpenAI API response is None")
-            if not response.choices:
-                self.logger.error("OpenAI API response has no choices")
-                raise TabooGameException("OpenAI API response has no choices")
+        try:
+            user_contents = self._hint_user_contents(props, None)
+            # One uncached call with n choices samples n independent hints for a single prompt and round trip
+            contents = await self._request_completion(self.system_prompt_hintgen, user_contents, HINT_RESPONSE_FORMAT, 1, n)
+            if len(contents) < n:
+                # Providers that ignore n return one choice; sample the rest concurrently
+                extra = await asyncio.gather(*[
+                    self._request_completion(self.system_prompt_hintgen, user_contents, HINT_RESPONSE_FORMAT, 1, 1)
+                    for _ in range(n - len(contents))
+                ])
+                contents += [choices[0] for choices in extra]
+            return [self._parse_hint(content) for content in contents[:n]]
+        except Exception as e:
+            self.logger.error("Failed to generate hints. OpenAI API error: %s", e)
+            raise TabooGameException(f"Failed to generate hints. OpenAI API error: {str(e)}")
 
-            content = response.choices[0].message.content
-            self.logger.info(f"OpenAI API response: {content}")
-            try:
-                parsed_content = json.loads(content)
-                if isinstance(parsed_content, dict) and "hint" in parsed_content:
-                    return parsed_content["hint"]
-                return content  # Fallback to raw content
-            except json.JSONDecodeError:
-                # Clean up raw string if it looks like JSON but couldn't be parsed
-                content = content.strip()
-                if content.startswith('{') and content.endswith('}'):
-                    # Try to extract text between quotes after a colon
-                    import re
-                    match = re.search(r':\s*"([^"]+)"', content)
-                    if match:
-                        return match.group(1)
-                return content
+    async def warm_hint_cache(self, props: Dict) -> None:
+        """Send the hint prompt prefix for a new word so the provider's prompt cache is warm for the first hint"""
+        try:
+            messages = self._build_messages(self.system_prompt_hintgen, self._hint_user_contents(props, None))
+            await self._create_completion(messages=messages, response_format=HINT_RESPONSE_FORMAT, max_tokens=1)
+            self.logger.debug("Hint prompt cache warmed")
         except Exception as e:
-            self.logger.error(f"Failed to generate hint. OpenAI API error: {str(e)}")
-            raise TabooGameException(f"Failed to generate hint. OpenAI API error: {str(e)}")
+            # Warming is best effort; the real hint request will simply pay the full prompt cost
+            self.logger.warning("Failed to warm hint prompt cache: %s", e)
+
+    def _validate_hint_input(self, props: Dict, previous_guesses: Optional[List[wrong_guess]]) -> None:
+        """Raise TabooGameException if the hint request arguments have the wrong types"""
+        if not isinstance(props, dict):
+            self.logger.error("Invalid input: props must be a dict, but got %s", type(props))
+            raise TabooGameException("Invalid input: props must be a dict")
+
+        if previous_guesses and not isinstance(previous_guesses, list):
+            self.logger.error("Invalid input: previous_guesses must be a list, but got %s", type(previous_guesses))
+            raise TabooGameException("Invalid input: previous_guesses must be a list")
+
+    @staticmethod
+    def _hint_user_contents(props: Dict, previous_guesses: Optional[List[wrong_guess]]) -> List[str]:
+        """Serialize a hint request into user messages.
+
+        The word properties stay byte-identical for a whole game, so they go first and
+        only the trailing guesses message changes between hint requests.
+        """
+        user_contents = [orjson.dumps(props, option=orjson.OPT_SORT_KEYS).decode()]
+        if previous_guesses:
+            # Repeated guesses add tokens without adding information; keep the first of each
+            seen = set()
+            unique_guesses = []
+            for g in previous_guesses:
+                predict = g.predict.strip().lower()
+                if predict not in seen:
+                    seen.add(predict)
+                    unique_guesses.append(g)
+            recent_guesses = unique_guesses[-MAX_PREVIOUS_GUESSES:]
+            # Clients resend every guess each turn; only guesses not seen before are encoded
+            user_contents.append('{"olderwrongs":[' + ",".join(map(_guess_json, recent_guesses)) + "]}")
+        return user_contents
+
+    @staticmethod
+    def _hint_semantic_text(props: Dict, previous_guesses: Optional[List[wrong_guess]]) -> str:
+        """Reduce a hint request to the word, its banned words and the set of wrong guesses, the parts that decide the hint"""
+        banned = props.get("banned")
+        if isinstance(banned, list):
+            banned = sorted(str(b).strip().lower() for b in banned)
+        predicts = sorted({g.predict.strip().lower() for g in previous_guesses or []})
+        return f"{props.get('word')}|{banned}|{predicts}"
+
+    def _queue_hints(self, game_id: str, hints: List[str]) -> None:
+        """Keep extra hints for later requests of the same game, bounding the number of tracked games"""
+        self._hint_queues[game_id] = deque(hints)
+        self._hint_queues.move_to_end(game_id)
+        if len(self._hint_queues) > HINT_QUEUE_GAMES:
+            self._hint_queues.popitem(last=False)
+
+    def _parse_hint(self, content: str) -> str:
+        """Extract the hint text from a completion that follows HINT_RESPONSE_FORMAT"""
+        try:
+            return _normalize_hint(HintSchema.model_validate_json(content).hint)
+        except ValidationError as e:
+            self.logger.error("Invalid hint response format: %s\nResponse: %s", e, content)
+            raise TabooGameException(f"Invalid hint response format: {str(e)}\nResponse: {content}")
 
 
 game = TabooGame()
@@ -200,32 +876,97 @@ class GameConfig(BaseModel):
     difficulty: str
     language: Optional[str] = "en"
 
-@app.post("/game")
-async def start_game(config: GameConfig):
+@app.post("/game", response_model=WordSchema)
+async def start_game(config: GameConfig, background_tasks: BackgroundTasks):
     game.logger.info("Route /game called")
     try:
-        taboo_properties = game.generate_taboo(game_config(**config.dict()))
+        taboo_properties = await game.generate_taboo(game_config(language=config.language, difficulty=config.difficulty, topic=config.topic))
+        if game.warm_prompt_cache:
+            background_tasks.add_task(game.warm_hint_cache, taboo_properties)
         return taboo_properties
     except TabooGameException as e:
-        game.logger.error(f"TabooGameException: {e}")
+        game.logger.error("TabooGameException: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        game.logger.error(f"Unexpected error: {e}")
+        game.logger.error("Unexpected error: %s", e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
 
 class HintRequest(BaseModel):
     props: Dict
     previous_guesses: Optional[List[wrong_guess]] = []
+    game_id: Optional[str] = None
+
+class HintsBatchResponse(BaseModel):
+    hints: List[str]
+
+class HintsUpfrontRequest(BaseModel):
+    props: Dict
+    n: Optional[int] = None
 
-@app.post("/hints")
+@app.post("/hints", response_model=HintSchema)
 async def get_hint(data: HintRequest):
     game.logger.info("Route /hints called")
     try:
-        hint = game.generate_hint(data.props, data.previous_guesses)
+        hint = await game.generate_hint(data.props, data.previous_guesses, game_id=data.game_id)
         return {"hint": hint}
     except TabooGameException as e:
-        game.logger.error(f"TabooGameException: {e}")
+        game.logger.error("TabooGameException: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        game.logger.error(f"Unexpected error: {e}")
-        raise HTTPException(status_code=500, detail="An unexpected error occurred")
\ No newline at end of file
+        game.logger.error("Unexpected error: %s", e)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+@app.post("/hints_batch", response_model=HintsBatchResponse)
+async def get_hints_batch(data: List[HintRequest]):
+    game.logger.info("Route /hints_batch called")
+    try:
+        if len(data) > MAX_HINTS_BATCH_SIZE:
+            raise TabooGameException(f"A batch may contain at most {MAX_HINTS_BATCH_SIZE} hint requests")
+        hints = await asyncio.gather(*[game.generate_hint(item.props, item.previous_guesses, game_id=item.game_id) for item in data])
+        return {"hints": hints}
+    except TabooGameException as e:
+        game.logger.error("TabooGameException: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        game.logger.error("Unexpected error: %s", e)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@app.post("/hints/upfront", response_model=HintsBatchResponse)
+async def get_hints_upfront(data: HintsUpfrontRequest):
+    game.logger.info("Route /hints/upfront called")
+    try:
+        hints = await game.generate_hints_batch(data.props, data.n)
+        return {"hints": hints}
+    except TabooGameException as e:
+        game.logger.error("TabooGameException: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        game.logger.error("Unexpected error: %s", e)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@app.post("/hints/stream")
+async def get_hint_stream(data: HintRequest):
+    game.logger.info("Route /hints/stream called")
+    events = game.stream_hint(data.props, data.previous_guesses)
+    try:
+        # Pull the first event before responding so that failures still map to an error status
+        first_event = await events.__anext__()
+    except TabooGameException as e:
+        game.logger.error("TabooGameException: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        game.logger.error("Unexpected error: %s", e)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+    async def event_stream():
+        yield b"data: " + orjson.dumps(first_event) + b"\n\n"
+        try:
+            async for event in events:
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            game.logger.error("Hint stream failed: %s", e)
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
\ No newline at end of file
@@ -73,6 +73,8 @@ class TabooGame {
 
             const data = await response.json();
             if (response.ok) {
+                // identifies this game to the server, so hints queued for it are not served to other players
+                this.gameId = Date.now().toString(36) + Math.random().toString(36).slice(2);
                 this.gameProps = data;
                  this.gameProps.banned = data.banned;
                 this.switchScreen('game-screen');
@@ -102,7 +104,8 @@ class TabooGame {
                 },
                 body: JSON.stringify({
                     props: this.gameProps,
-                    previous_guesses: this.previousGuesses
+                    previous_guesses: this.previousGuesses,
+                    game_id: this.gameId
                 })
             });
 
@@ -119,7 +122,7 @@ class TabooGame {
                  requestAnimationFrame(() => guessInput.focus());
             } else {
                  this.showError('Unable to get new hint. Please try again.');
-                 console.error('Error getting hint:', data.error);
+                 console.error('Error getting hint:', data.detail);
             }
         } catch (error) {
             console.error('Failed to get hint:', error);
@@ -163,37 +166,36 @@ class TabooGame {
      }
 
     levenshteinDistance(a, b) {
-        if (a.length === 0) return b.length;
-        if (b.length === 0) return a.length;
-
-        const matrix = [];
-
-        // increment along the first column of each row
-        let i;
-        for (i = 0; i <= b.length; i++) {
-            matrix[i] = [i];
-        }
-
-        // increment each column in the first row
-        let j;
-        for (j = 0; j <= a.length; j++) {
-            matrix[0][j] = j;
+        a = a.toLowerCase();
+        b = b.toLowerCase();
+        if (a.length === 0) return b.length === 0 ? 1 : 0;
+        if (b.length === 0) return 0;
+
+        // keep the shorter string along the rows so only two short rows are allocated
+        if (a.length > b.length) [a, b] = [b, a];
+
+        let previousRow = new Array(a.length + 1);
+        let currentRow = new Array(a.length + 1);
+        for (let j = 0; j <= a.length; j++) {
+            previousRow[j] = j;
         }
 
-        // Fill in the rest of the matrix
-        for (i = 1; i <= b.length; i++) {
-            for (j = 1; j <= a.length; j++) {
-                if (b.charAt(i - 1) === a.charAt(j - 1)) {
-                    matrix[i][j] = matrix[i - 1][j - 1];
+        for (let i = 1; i <= b.length; i++) {
+            currentRow[0] = i;
+            const bChar = b.charCodeAt(i - 1);
+            for (let j = 1; j <= a.length; j++) {
+                if (bChar === a.charCodeAt(j - 1)) {
+                    currentRow[j] = previousRow[j - 1];
                 } else {
-                    matrix[i][j] = Math.min(matrix[i - 1][j - 1] + 1, // substitution
-                        Math.min(matrix[i][j - 1] + 1, // insertion
-                            matrix[i - 1][j] + 1)); // deletion
+                    currentRow[j] = Math.min(previousRow[j - 1] + 1, // substitution
+                        currentRow[j - 1] + 1, // insertion
+                        previousRow[j] + 1); // deletion
                 }
             }
+            [previousRow, currentRow] = [currentRow, previousRow];
         }
 
-        return 1 - (matrix[b.length][a.length] / Math.max(a.length, b.length));
+        return 1 - (previousRow[a.length] / b.length);
     }
 
     updateGameInfo(difficulty, topic) {